@@ -1,7 +1,7 @@
 
 import logging
 from flask import Flask
-from flask_sqlalchemy import SQLAlchemy as _BaseSQLAlchemy
+from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
 from flask_talisman import Talisman
@@ -9,11 +9,7 @@ from flask_ipban import IpBan
 from config import Config, get_logger_handler
 
 
-# database
-class SQLAlchemy(_BaseSQLAlchemy):
-    def apply_pool_defaults(self, app, options):
-        super(SQLAlchemy, self).apply_pool_defaults(app, options)
-        options["pool_pre_ping"] = True
+# database - sessions are scoped to the app context and engine pooling is set in Config.SQLALCHEMY_ENGINE_OPTIONS
 db = SQLAlchemy()
 migrate = Migrate()
 cors = CORS()
@@ -8,22 +8,24 @@ and pdf rendering. These functions glue together other higher-level functions fo
 import os
 import re
 import json
-import multiprocessing
+import tempfile
 from PyPDF4 import PdfFileMerger
 from PyPDF2 import PdfFileWriter, PdfFileReader
 from jinja2 import Environment, BaseLoader, StrictUndefined
 from api import global_config
 
 
+PDF_READ_BUFFER = 1024 * 1024
+
+
 def ordered_dedupe(seq):
     """
     Deduplicate a list while preserving its order.
     :param seq:
     :return:
     """
-    seen = set()
-    seen_add = seen.add
-    return [x for x in seq if not (x in seen or seen_add(x))]
+    # dicts keep insertion order, so fromkeys dedupes in a single C-level pass
+    return list(dict.fromkeys(seq))
 
 
 def str_is_parametrized(target_str):
@@ -221,16 +223,18 @@ def split_pdf(target_pdf_fname):
     :return:
     :rtype:
     """
-    input_pdf = PdfFileReader(open(target_pdf_fname, "rb"))
     out_list = []
-    for i in range(input_pdf.numPages):
-        output = PdfFileWriter()
-        output.addPage(input_pdf.getPage(i))
+    # Pages are parsed lazily from the stream, so keep the file open until every page has been written
+    with open(target_pdf_fname, "rb", buffering=PDF_READ_BUFFER) as input_stream:
+        input_pdf = PdfFileReader(input_stream)
         temp_name = os.path.join(global_config.TEMP_DIR, os.path.basename(target_pdf_fname).replace('.pdf', ''))
-        out_fname = f"{temp_name}_{i:03}.pdf"
-        out_list.append(out_fname)
-        with open(out_fname, "wb") as outputStream:
-            output.write(outputStream)
+        for i, page in enumerate(input_pdf.pages):
+            output = PdfFileWriter()
+            output.addPage(page)
+            out_fname = f"{temp_name}_{i:03}.pdf"
+            out_list.append(out_fname)
+            with open(out_fname, "wb") as outputStream:
+                output.write(outputStream)
     return out_list
 
 
@@ -254,17 +258,14 @@ def get_crop_margins(page, crop_percent, side='both'):
         return (w_diff, h_diff), (width - w_diff, height - h_diff), scale
 
 
-def crop_page(kwargs):
-    """ Thread-safe page cropping for pypdf2 pdf pages."""
-    page, page_idx, crop_percent = kwargs['page'], int(kwargs['page_idx']), float(kwargs['crop_percent'])
-    even_idx_right = kwargs.get('even_idx_right', True)
-    if even_idx_right:
-        side = 'right' if page_idx % 2 == 0 else 'left'
-    else:
-        side = 'left' if page_idx % 2 == 0 else 'right'
-    uxuy_lxly_scale = get_crop_margins(page, crop_percent, side=side)
-    page = crop_page_margins(page, uxuy_lxly_scale)
-    return page_idx, page
+def crop_page(page, page_idx, crop_percent, even_idx_right=True):
+    """
+    Crop a pypdf2 pdf page on the side that alternates with its index.
+    By default even pages lose their right margin and odd pages their left.
+    """
+    is_right = (page_idx % 2 == 0) == even_idx_right
+    uxuy_lxly_scale = get_crop_margins(page, crop_percent, side='right' if is_right else 'left')
+    return crop_page_margins(page, uxuy_lxly_scale)
 
 
 def crop_pdf_margins(target_pdf, page_crop_percent=0.05):
@@ -273,18 +274,22 @@ def crop_pdf_margins(target_pdf, page_crop_percent=0.05):
     """
     pdf_dir, pdf_fname = os.path.dirname(target_pdf), os.path.basename(target_pdf)
     pdf_out = os.path.join(global_config.TEMP_DIR, pdf_fname)
-    pdf_reader = PdfFileReader(target_pdf)
     pdf_writer = PdfFileWriter()
-    pool = multiprocessing.Pool(processes=6)
-    page_params = [{'page': page, 'page_idx': idx, 'crop_percent': page_crop_percent}
-                   for idx, page in enumerate(pdf_reader.pages)]
-    pages = pool.map(crop_page, page_params)
-    pool.close()
-    pool.join()
-    sorted_pages = sorted(pages, key=lambda tup: tup[0])
-    [pdf_writer.addPage(page[1]) for page in sorted_pages]
-    with open(pdf_out, 'wb') as output_file:
-        pdf_writer.write(output_file)
+    # Read from an open stream instead of a path so PyPDF2 doesn't copy the whole file into memory first
+    with open(target_pdf, 'rb', buffering=PDF_READ_BUFFER) as input_stream:
+        pdf_reader = PdfFileReader(input_stream)
+        for idx, page in enumerate(pdf_reader.pages):
+            pdf_writer.addPage(crop_page(page, idx, page_crop_percent))
+        # PyPDF2 reads objects from the input lazily while writing, and pdf_out is the input itself when cropping
+        # a file from TEMP_DIR, so write to a scratch file and swap it into place once the input is done with.
+        out_fd, temp_out = tempfile.mkstemp(suffix='.pdf', dir=global_config.TEMP_DIR)
+        try:
+            with os.fdopen(out_fd, 'wb') as output_file:
+                pdf_writer.write(output_file)
+        except BaseException:
+            os.remove(temp_out)
+            raise
+    os.replace(temp_out, pdf_out)
     return pdf_out
 
 
@@ -1,4 +1,5 @@
 
+from sqlalchemy.orm import selectinload
 from api import db
 from api.models import User, Address, BannedToken, BaseDAO
 
@@ -38,7 +39,8 @@ class UserDAO(BaseDAO):
 
     @classmethod
     def list(cls):
-        return cls.table.query.all()
+        # Load every user's addresses in one extra query instead of one per user when serializing
+        return cls.table.query.options(selectinload(cls.table.addresses)).all()
 
     def register(self, email, password):
         if User.query.filter_by(email=email).first() is not None:
@@ -70,7 +72,8 @@ class UserDAO(BaseDAO):
         return self.user
 
     def get_addresses(self):
-        return self.user.addresses.order_by(Address.created.desc()).all()
+        """ Get the user's addresses, most recent first """
+        return self.user.addresses
 
     def get_mailing_address(self, strict=False):
         """
@@ -79,7 +82,7 @@ class UserDAO(BaseDAO):
         addr = Address.query.filter_by(user_id=self.user.id).filter_by(is_billing=False)\
             .order_by(Address.created.desc()).first()
         if addr is None and self.get_addresses() not in (None, []) and strict is False:
-            addr = self.user.addresses.order_by(Address.created.desc()).first()
+            addr = self.get_addresses()[0]
         return addr
 
     def get_billing_address(self, strict=False):
@@ -89,7 +92,7 @@ class UserDAO(BaseDAO):
         addr = Address.query.filter_by(user_id=self.user.id).filter_by(is_billing=True)\
             .order_by(Address.created.desc()).first()
         if addr is None and self.get_addresses() not in (None, []) and strict is False:
-            addr = self.user.addresses.order_by(Address.created.desc()).first()
+            addr = self.get_addresses()[0]
         return addr
 
 
@@ -13,14 +13,15 @@ but doesn't do a commit operation.
 """
 
 
-import os
 import time
 import random
-import base64
+import secrets
 import jwt
+from operator import itemgetter
 from datetime import datetime, timedelta
 from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy.dialects import postgresql
 from config import Config
 from api import db
 from sqlalchemy.schema import DropTable
@@ -40,7 +41,7 @@ def models_to_dict(models):
     Convert all the referenced data in a table to dict, sorted by most recent first
     """
     out_list = [model.to_dict() for model in models]
-    return sorted(out_list, key=lambda x: x['created'], reverse=True)
+    return sorted(out_list, key=itemgetter('created'), reverse=True)
 
 
 class DataMixin(object):
@@ -54,7 +55,7 @@ class DataMixin(object):
     id = db.Column(db.BigInteger, primary_key=True, index=True, unique=True)
     created = db.Column(db.DateTime, index=True, nullable=False, default=datetime.utcnow)
     updated = db.Column(db.DateTime, onupdate=datetime.utcnow, nullable=False, default=datetime.utcnow)
-    data = db.Column(db.JSON, nullable=True, default={'version': global_config.VERSION, 'data': {}})
+    data = db.Column(postgresql.JSONB, nullable=True, default={'version': global_config.VERSION, 'data': {}})
 
     def bump_updated(self):
         """ Indicate a table update by setting the 'updated' time to now """
@@ -92,6 +93,10 @@ class DataMixin(object):
         assert new_data is not None
         if self.data is None:
             self.data = self.get_data()
+        # Nothing to merge, so skip flagging the column and bumping 'updated'.
+        # Non-empty updates always flag it since callers may have edited the dict from get_data() in place.
+        if not new_data:
+            return self.get_data()
         self.data.update(new_data)
         flag_modified(self, "data")
         self.bump_updated()
@@ -109,7 +114,6 @@ class Mailinglist(DataMixin, db.Model):
     User entries in the mailing list form.
     """
     plural = 'mailinglists'
-    __table_args__ = {'extend_existing': True}
     # Top-level fields
     name = db.Column(db.String(128), default='', nullable=False)
     email = db.Column(db.String(128), nullable=False)
@@ -144,7 +148,6 @@ class Contact(DataMixin, db.Model):
     User entries in the contact us form or feedback surveys.
     """
     plural = 'contacts'
-    __table_args__ = {'extend_existing': True}
     # Top-level fields
     name = db.Column(db.String(128), nullable=False)
     email = db.Column(db.String(128), nullable=False)
@@ -190,25 +193,22 @@ class BannedToken(DataMixin, db.Model):
         return {}
 
     @staticmethod
-    def create_new(token):
+    def create_new(token, commit=True):
         if isinstance(token, bytes):
             token = token.decode('utf-8')
         # noinspection PyArgumentList
         b_token = BannedToken(token=token)
         db.session.add(b_token)
-        db.session.commit()
+        if commit:
+            db.session.commit()
         return b_token
 
     @staticmethod
     def check_banned(token):
         if isinstance(token, bytes):
             token = token.decode('utf-8')
-        # check whether auth token has been banned
-        res = BannedToken.query.filter_by(token=str(token)).first()
-        if res:
-            return True
-        else:
-            return False
+        # check whether auth token has been banned with an EXISTS probe against the unique token index
+        return db.session.query(BannedToken.query.filter_by(token=str(token)).exists()).scalar()
 
 
 class User(DataMixin, db.Model):
@@ -218,9 +218,9 @@ class User(DataMixin, db.Model):
     Registered users are identified with is_anon=False
     """
     plural = 'users'
-    __table_args__ = {'extend_existing': True}
     # Foreign key cols
-    addresses = db.relationship('Address', backref=db.backref("user_addrs", cascade="all"), lazy='dynamic')
+    addresses = db.relationship('Address', backref=db.backref("user_addrs", cascade="all"),
+                                order_by='Address.created.desc()')
     # Top-level fields
     email = db.Column(db.String(512), index=True)
     token = db.Column(db.String(512), index=True)
@@ -239,10 +239,6 @@ class User(DataMixin, db.Model):
             "is_admin": self.is_admin,
             "privacy": self.privacy,
             "addresses": models_to_dict(self.addresses),
-            "orders": models_to_dict(self.orders),
-            "products": models_to_dict(self.products),
-            "surveys": models_to_dict(self.surveys),
-            "stats": models_to_dict(self.stats),
             "created": self.created.timestamp(),
             "updated": self.updated.timestamp()
         }
@@ -253,9 +249,10 @@ class User(DataMixin, db.Model):
         new_user = User(email=email, privacy=privacy, is_admin=is_admin)
         data = data or {}
         new_user.update_data(data)
-        db.session.add(new_user)
         new_user.get_token()
-        db.session.commit()
+        db.session.add(new_user)
+        # Flush to assign the id for the jwt, then let set_jwt commit everything in one transaction
+        db.session.flush()
         new_user.set_jwt()
         return new_user
 
@@ -264,13 +261,16 @@ class User(DataMixin, db.Model):
         pass
 
     def get_token(self, expires_in=3600*4):
+        """
+        Get the current token or refresh it if it's about to expire.
+        This doesn't commit, so callers should commit the session after a refresh.
+        """
         now = datetime.utcnow()
         if self.token and self.token_expiration is not None and self.token_expiration > now + timedelta(seconds=60):
             return self.token
-        self.token = base64.b64encode(os.urandom(24)).decode('utf-8')
+        self.token = secrets.token_urlsafe(24)
         self.token_expiration = now + timedelta(seconds=expires_in)
         db.session.add(self)
-        db.session.commit()
         return self.token
 
     def revoke_token(self):
@@ -293,12 +293,12 @@ class User(DataMixin, db.Model):
         token = jwt.encode({'sub': str(self.id),
                             'iat': time.time(),
                             'exp': datetime.utcnow() + timedelta(days=expires_in_days),
-                            'jti': base64.b64encode(os.urandom(24)).decode('utf-8')},
+                            'jti': secrets.token_urlsafe(24)},
                            global_config.UID_SECRET_KEY, algorithm='HS256')
         self.token = token
-        db.session.commit()
         if prev_token is not None:
-            BannedToken.create_new(prev_token)
+            BannedToken.create_new(prev_token, commit=False)
+        db.session.commit()
         return token
 
     @staticmethod
@@ -356,7 +356,6 @@ class Address(DataMixin, db.Model):
     User address information for shipping and localization
     """
     plural = 'addresses'
-    __table_args__ = {'extend_existing': True}
     # Foreign key cols
     user_id = db.Column(db.BigInteger, db.ForeignKey('user.id'), nullable=False)
     # Top-level fields
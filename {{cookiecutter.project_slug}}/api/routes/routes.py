@@ -169,7 +169,9 @@ def register():
         user = UserDAO(user=token_auth.current_user()).register(email=data['email'], password=data['password'])
     except ValueError as err:
         return abort(403, err)
-    return jsonify({'token': user.get_token()})
+    token = user.get_token()
+    db.session.commit()
+    return jsonify({'token': token})
 
 
 @bp.route('/login', methods=['POST'])
@@ -186,7 +188,9 @@ def login():
         user = UserDAO.login(email=data['email'], password=data['password'], current_user=token_auth.current_user())
     except ValueError as err:
         return abort(403, err)
-    return jsonify({'token': user.get_token()})
+    token = user.get_token()
+    db.session.commit()
+    return jsonify({'token': token})
 
 
 @bp.route('/logout', methods=['GET', 'POST'])
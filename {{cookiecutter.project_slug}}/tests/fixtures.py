@@ -34,12 +34,16 @@ retry_config = dict(exceptions=(selenium.common.exceptions.NoSuchElementExceptio
                                 TypeError),
                     tries=12, delay=0, max_delay=None, backoff=1, jitter=0, logger=logger)
 
+BLOCKED_MEDIA_URLS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.woff', '*.woff2', '*.ttf', '*.mp4',
+                      '*.webm']
 
-def get_webdriver(is_headless=True, remote_url=None):
+
+def get_webdriver(is_headless=True, remote_url=None, block_media=False):
     """
     Get an instance of the chrome webdriver.
     :param is_headless:
     :param remote_url:
+    :param block_media: Skip loading images, fonts, and video to speed up tests that don't take screenshots.
     :return:
     """
     if is_headless is True:
@@ -57,6 +61,8 @@ def get_webdriver(is_headless=True, remote_url=None):
         chrome_options.add_argument("--no-first-run")
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--ignore-certificate-errors")
+        if block_media is True:
+            chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
         capabilities = DesiredCapabilities.CHROME.copy()
         capabilities['acceptSslCerts'] = True
         capabilities['acceptInsecureCerts'] = True
@@ -71,6 +77,10 @@ def get_webdriver(is_headless=True, remote_url=None):
     else:
         print(f'Loading full local webdriver with interface')
         driver = webdriver.Chrome()
+    if block_media is True and hasattr(driver, 'execute_cdp_cmd'):
+        # Remote drivers don't expose CDP, so they only get the image preference above
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_MEDIA_URLS})
     driver.set_page_load_timeout(90)
     driver.maximize_window()
     return driver
@@ -101,12 +111,12 @@ def download_file(url, test_filename):
     target_file = os.path.join(Config().PROJECT_DIR, global_config.TEST_DIR + f'/{test_filename}')
     if os.path.exists(target_file):
         os.remove(target_file)
-    r = requests.get(url, stream=True)
-    if r.status_code == 200:
-        with open(target_file, 'wb') as f:
-            r.raw.decode_content = True
-            shutil.copyfileobj(r.raw, f)
-        return target_file
+    with requests.get(url, stream=True) as r:
+        if r.status_code == 200:
+            with open(target_file, 'wb') as f:
+                r.raw.decode_content = True
+                shutil.copyfileobj(r.raw, f, length=1024 * 1024)
+            return target_file
 
 
 def fullpage_screenshot(driver, dirname, fname, target_width=None, height=None):
@@ -126,15 +136,15 @@ def fullpage_screenshot(driver, dirname, fname, target_width=None, height=None):
     else:
         target_widths = {'xs': 550, 'sm': 750, 'md': 980, 'lg': 1150, 'xl': 1920}
     for wname, width in target_widths.items():
-        time.sleep(0.3)
         if height is None:
+            # Measure the document once in the browser and reuse it for every breakpoint
             driver.set_window_size(width, 8000)
-            time.sleep(0.3)
-            element = driver.find_element_by_tag_name('body')
-            height = element.size["height"]
+            time.sleep(0.1)
+            height = driver.execute_script('return document.body.scrollHeight')
         # Render with height + height of cookie warning
         driver.set_window_size(width, height + 64.8)
-        time.sleep(0.3)
+        # Short pause for css transitions to settle after the resize
+        time.sleep(0.1)
         driver.save_screenshot(os.path.join(dirname, f'{wname}--{fname}.png'))
 
 
@@ -167,7 +177,8 @@ class IntegrationBaseCase(unittest.TestCase):
         global_config.RECAPTCHA_ENABLED = False
         self.app = create_test_app()
         self.driver = get_webdriver(is_headless=global_config.TEST_HEADLESS and run_headless,
-                                    remote_url=global_config.WEBDRIVER_URL)
+                                    remote_url=global_config.WEBDRIVER_URL,
+                                    block_media=not global_config.DO_SCREENSHOTS)
         time.sleep(0.5)
         self.driver.get(server_url)
         time.sleep(0.5)
@@ -227,7 +238,8 @@ class AcceptanceBaseCase(unittest.TestCase):
         """Setup the test driver and create test users"""
         global_config.RECAPTCHA_ENABLED = False
         self.driver = get_webdriver(is_headless=global_config.TEST_HEADLESS and run_headless,
-                                    remote_url=global_config.WEBDRIVER_URL)
+                                    remote_url=global_config.WEBDRIVER_URL,
+                                    block_media=not global_config.DO_SCREENSHOTS)
         self.driver.set_page_load_timeout(30)
         self.driver.get(server_url)
         self.env = PreloadedEnv(driver=self.driver, server_url=server_url)
@@ -18,7 +18,7 @@ class QuickstartUser(HttpUser):
     driver = None
 
     def on_start(self):
-        self.driver = get_webdriver(is_headless=True, remote_url=global_config.WEBDRIVER_URL)
+        self.driver = get_webdriver(is_headless=True, remote_url=global_config.WEBDRIVER_URL, block_media=True)
         time.sleep(0.5)
         self.driver.get(global_config.SERVER_URL)
         time.sleep(0.5)
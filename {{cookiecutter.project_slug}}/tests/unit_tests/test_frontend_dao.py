@@ -6,6 +6,7 @@ import unittest
 import datetime
 from config import Config
 from api import global_config, db
+from api.models import BannedToken
 from api.daos.user import UserDAO, User
 from tests.unit_tests import BaseCase
 
@@ -60,6 +61,73 @@ class RoutesCase(BaseCase):
         self.assertEqual(response.status_code, 404)
 
 
+class DataMixinCase(BaseCase):
+    """
+    Ensure that changes to the json data column are persisted
+    """
+
+    def reload_user(self):
+        user_id = self.user.id
+        db.session.expire_all()
+        return User.query.get(user_id)
+
+    def test_update_data(self):
+        self.user.update_data({'color': 'blue'})
+        db.session.commit()
+        self.assertEqual(self.reload_user().get_data('color'), 'blue')
+
+    def test_update_data_after_in_place_edit(self):
+        """Editing the dict from get_data() and passing the same values back must still be saved"""
+        data = self.user.get_data()
+        data['color'] = 'green'
+        self.user.update_data({'color': 'green'})
+        db.session.commit()
+        self.assertEqual(self.reload_user().get_data('color'), 'green')
+
+    def test_update_data_with_own_data(self):
+        self.user.get_data()['size'] = 'large'
+        self.user.update_data(self.user.get_data())
+        db.session.commit()
+        self.assertEqual(self.reload_user().get_data('size'), 'large')
+
+    def test_update_data_empty(self):
+        updated = self.user.updated
+        self.assertEqual(self.user.update_data({}), self.user.get_data())
+        self.assertEqual(self.user.updated, updated)
+
+
+class UserTokenCase(BaseCase):
+    """
+    Ensure that user tokens are only persisted by the caller's commit
+    """
+
+    def test_create_new(self):
+        email = f"create_new_{self.username}@test.com"
+        new_user = User.create_new(email=email)
+        # Anything create_new didn't commit is discarded here
+        db.session.rollback()
+        saved_user = User.query.filter_by(email=email).one()
+        self.assertEqual(saved_user.id, new_user.id)
+        self.assertEqual(User.get_decoded_id(saved_user.token), saved_user.id)
+        banned_tokens = BannedToken.query.all()
+        self.assertEqual(len(banned_tokens), 1)
+        self.assertNotEqual(banned_tokens[0].token, saved_user.token)
+
+    def test_get_token_without_commit(self):
+        user_id = self.user.id
+        token = self.user.get_token()
+        self.assertIsNotNone(token)
+        db.session.rollback()
+        self.assertIsNone(User.query.get(user_id).token)
+        self.assertEqual(User.query.filter_by(token=token).count(), 0)
+
+    def test_get_token_with_commit(self):
+        token = self.user.get_token()
+        db.session.commit()
+        db.session.expire_all()
+        self.assertEqual(User.check_token(token).id, self.user.id)
+
+
 if __name__ == "__main__":
     if os.environ.get("ENV") not in ("testing", "staging"):
         raise ValueError(f"Unit tests must be run with ENV == testing or ENV == staging "
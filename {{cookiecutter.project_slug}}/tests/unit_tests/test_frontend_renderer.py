@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+
+import os
+import unittest
+from PyPDF2 import PdfFileReader
+from api import global_config
+from api.daos.renderer_base import crop_pdf_margins, PDF_READ_BUFFER
+
+
+def write_test_pdf(fpath, num_pages=2, width=600, height=800):
+    """
+    Write a PDF whose pages share a font resource through an indirect reference. The font sits behind
+    more than PDF_READ_BUFFER bytes of padding, so a reader whose input gets truncated can't resolve it.
+    """
+    padding = b"0" * (PDF_READ_BUFFER * 2)
+    page_nums = [3 + idx * 2 for idx in range(num_pages)]
+    padding_num = page_nums[-1] + 2
+    font_num = padding_num + 1
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        2: b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % num for num in page_nums) +
+           b"] /Count %d >>" % num_pages,
+        padding_num: b"<< /Length %d >>\nstream\n" % len(padding) + padding + b"\nendstream",
+        font_num: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    for page_num in page_nums:
+        content = b"BT /F1 24 Tf 72 720 Td (page %d) Tj ET" % page_num
+        objects[page_num] = b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] " % (width, height) + \
+                            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>" % (font_num, page_num + 1)
+        objects[page_num + 1] = b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream"
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for num in sorted(objects):
+        offsets[num] = len(out)
+        out += b"%d 0 obj\n" % num + objects[num] + b"\nendobj\n"
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offsets[num] for num in sorted(objects))
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    with open(fpath, 'wb') as fp:
+        fp.write(bytes(out))
+    return fpath
+
+
+class CropPdfCase(unittest.TestCase):
+    """
+    Ensure that cropping PDF margins produces a valid document
+    """
+
+    def setUp(self):
+        self.pdf_fpath = write_test_pdf(os.path.join(global_config.TEMP_DIR, 'crop_test_source.pdf'))
+
+    def tearDown(self):
+        if os.path.exists(self.pdf_fpath):
+            os.remove(self.pdf_fpath)
+
+    def test_crop_in_temp_dir(self):
+        """Cropping a file that already lives in TEMP_DIR overwrites its own input"""
+        temp_files = sorted(os.listdir(global_config.TEMP_DIR))
+        out_fpath = crop_pdf_margins(self.pdf_fpath, page_crop_percent=0.1)
+        self.assertEqual(os.path.abspath(out_fpath), os.path.abspath(self.pdf_fpath))
+        # The scratch output should have been swapped into place rather than left behind
+        self.assertEqual(sorted(os.listdir(global_config.TEMP_DIR)), temp_files)
+        with open(out_fpath, 'rb') as fp:
+            reader = PdfFileReader(fp)
+            self.assertEqual(reader.numPages, 2)
+            for page in reader.pages:
+                font = page['/Resources']['/Font']['/F1'].getObject()
+                self.assertEqual(font['/BaseFont'], '/Helvetica')
+
+    def test_crop_alternating_sides(self):
+        """Even pages lose their right margin and odd pages their left, then scale back to full width"""
+        out_fpath = crop_pdf_margins(self.pdf_fpath, page_crop_percent=0.1)
+        with open(out_fpath, 'rb') as fp:
+            even_page, odd_page = PdfFileReader(fp).pages
+            self.assertAlmostEqual(float(even_page.mediaBox.getLowerLeft_x()), 0)
+            self.assertAlmostEqual(float(even_page.mediaBox.getUpperRight_x()), 600)
+            self.assertAlmostEqual(float(odd_page.mediaBox.getLowerLeft_x()), 60 * 600 / 540, places=3)
+
+
+if __name__ == "__main__":
+    if os.environ.get("ENV") not in ("testing", "staging"):
+        raise ValueError(f"Unit tests must be run with ENV == testing or ENV == staging "
+                         f"instead of {os.environ.get('ENV')}")
+    # Run the tests
+    unittest.main(verbosity=2, failfast=False)